@@ -3,6 +3,11 @@ from sqlalchemy import create_engine, text
 import logging
 import pandas as pd
 
+try:  # ADBC is optional; without it we fall back to SQLAlchemy
+    import adbc_driver_sqlite.dbapi as adbc_sqlite
+except ImportError:
+    adbc_sqlite = None
+
 # Name our logger so we know that logs from this module come from the data_ingestion module
 logger = logging.getLogger('data_ingestion')
 # Set a basic logging message up that prints out a timestamp, the name of our logger, and the message
@@ -34,20 +39,42 @@ def create_db_engine(db_path):
         logger.error(f"Failed to create database engine. Error: {e}")
         raise e
     
-def query_data(engine, sql_query):
+def query_data(engine, sql_query, chunksize=None, dtype=None):
     """
     Query the data using the pandas method read_sql_query.
 
+    If the engine points at an SQLite database file and adbc_driver_sqlite is installed, the query
+    runs over a short-lived ADBC connection instead, so pandas reads Arrow record batches directly.
+    Both paths give DataFrames with the same dtypes.
+
     Parameters:
     - engine (sqlalchemy.engine.base.Engine): The engine.
     - sql_query (str): The SQL query.
+    - chunksize (int, optional): Number of rows to fetch per chunk. If given, the result is
+      read over SQLAlchemy in chunks and concatenated, instead of being fetched in one go
+      (default is None). Each chunk infers its own column types, so a chunk that is all NULL
+      in a column can change that column's dtype; pass dtype to pin it.
+    - dtype (dict, optional): Column dtypes passed to read_sql_query (default is None).
 
     Returns:
     - pd.DataFrame: The result DataFrame of the query.
     """
     try:
-        with engine.connect() as connection:
-            df = pd.read_sql_query(text(sql_query), connection)
+        url = engine.url
+        use_adbc = chunksize is None and adbc_sqlite is not None
+        if use_adbc and url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:'):
+            # Arrow batches are converted straight into NumPy-backed columns, skipping per-row Python tuples,
+            # so the result has the same dtypes as the SQLAlchemy path
+            with adbc_sqlite.connect(url.database) as connection:
+                df = pd.read_sql_query(sql_query, connection, dtype=dtype)
+        else:
+            with engine.connect() as connection:
+                if chunksize is None:
+                    df = pd.read_sql_query(text(sql_query), connection, dtype=dtype)
+                else:
+                    # An empty result still yields one empty chunk, so there is always something to concatenate
+                    chunks = pd.read_sql_query(text(sql_query), connection, chunksize=chunksize, dtype=dtype)
+                    df = pd.concat(chunks, ignore_index=True)
         if df.empty:
             # Log a message or handle the empty DataFrame scenario as needed
             msg = "The query returned an empty DataFrame."
@@ -62,18 +89,34 @@ def query_data(engine, sql_query):
         logger.error(f"An error occurred while querying the database. Error: {e}")
         raise e
     
-def read_from_web_CSV(URL):
+def read_from_web_CSV(URL, **kwargs):
     """
     Read a CSV file from the web using the pandas method read_csv.
 
+    Pass engine='pyarrow' to parse on several threads (requires pyarrow). Note that the pyarrow
+    parser infers some types differently, e.g. it reads ISO timestamps as datetimes. With it,
+    blank header names are renamed to 'Unnamed: <position>', and a blank index name becomes None,
+    as with the default pandas parser.
+
     Parameters:
     - URL (str): The URL of the CSV data.
+    - **kwargs: Additional keyword arguments passed to pd.read_csv, e.g. index_col or usecols.
 
     Returns:
-    - pd.DataFrame: The DataFrame containing the data from the CSV file.
+    - pd.DataFrame: The DataFrame containing the data from the CSV file. If a chunksize is
+      passed, an iterator of DataFrames (pandas.io.parsers.TextFileReader) is returned instead.
     """
     try:
-        df = pd.read_csv(URL)
+        if kwargs.get('chunksize') is not None:
+            # A chunked read returns an iterator rather than a DataFrame, so there are no headers to fix
+            reader = pd.read_csv(URL, **kwargs)
+            logger.info("CSV file opened from the web for reading in chunks.")
+            return reader
+        df = pd.read_csv(URL, **kwargs)
+        if kwargs.get('engine') == 'pyarrow':
+            df.columns = [f"Unnamed: {i}" if name == '' else name for i, name in enumerate(df.columns)]
+            if df.index.name == '':
+                df.index.name = None
         logger.info("CSV file read successfully from the web.")
         return df
     except pd.errors.EmptyDataError as e:
@@ -2,6 +2,20 @@ import pandas as pd
 from data_processing.data_ingestion import create_db_engine, query_data, read_from_web_CSV
 import logging
 
+try:  # pyarrow is optional; it lets read_csv parse on several threads
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+# Set up the class logger once at import, so each new instance only has to pick its level
+_FIELD_LOGGER = logging.getLogger(__name__ + ".FieldDataProcessor")
+_FIELD_LOGGER.propagate = False  # Prevents log messages from being propagated to the root logger
+if not _FIELD_LOGGER.handlers:  # Guard against duplicate handlers when the module is reloaded
+    _handler = logging.StreamHandler()  # Create console handler
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    _FIELD_LOGGER.addHandler(_handler)
+
 
 class FieldDataProcessor:
     """
@@ -23,7 +37,7 @@ class FieldDataProcessor:
 
     Methods:
     - initialize_logging(logging_level): Set up logging for the instance.
-    - ingest_sql_data(): Create the engine and read data from SQL.
+    - ingest_sql_data(chunksize=None): Create the engine and read data from SQL.
     - rename_columns(): Rename specified columns in the DataFrame.
     - apply_corrections(column_name='Crop_type', abs_column='Elevation'): Apply corrections to specified columns.
     - weather_station_mapping(): Read data from the weather station mapping CSV.
@@ -42,7 +56,7 @@ class FieldDataProcessor:
         self.columns_to_rename = config_params['columns_to_rename']
         self.values_to_rename = config_params['values_to_rename']
         self.weather_map_data = config_params['weather_mapping_csv']
-        
+
         self.initialize_logging(logging_level)
 
         # We create empty objects to store the DataFrame and engine in
@@ -58,9 +72,7 @@ class FieldDataProcessor:
         Parameters:
         - logging_level (str): Logging level for the class.
         """
-        logger_name = __name__ + ".FieldDataProcessor"
-        self.logger = logging.getLogger(logger_name)
-        self.logger.propagate = False  # Prevents log messages from being propagated to the root logger
+        self.logger = _FIELD_LOGGER
 
         # Set logging level
         if logging_level.upper() == "DEBUG":
@@ -75,30 +87,41 @@ class FieldDataProcessor:
 
         self.logger.setLevel(log_level)
 
-        # Only add handler if not already added to avoid duplicate messages
-        if not self.logger.handlers:
-            ch = logging.StreamHandler()  # Create console handler
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            ch.setFormatter(formatter)
-            self.logger.addHandler(ch)
-
         # Use self.logger.info(), self.logger.debug(), etc.
             
 
     # let's focus only on this part from now on
-    def ingest_sql_data(self):
+    def ingest_sql_data(self, chunksize=None):
         """
         Create the engine and read data from SQL.
 
+        Parameters:
+        - chunksize (int, optional): Number of rows fetched per chunk from the database. Chunks infer
+          their types separately, so leave this unset unless the result is too large to fetch at once
+          (default is None).
+
         Returns:
         - pd.DataFrame: Processed DataFrame.
         """
         self.engine = create_db_engine(self.db_path)
-        self.df = query_data(self.engine, self.sql_query)
+        self.df = query_data(self.engine, self.sql_query, chunksize=chunksize)
+        self._shrink_dtypes()
         self.logger.info("Sucessfully loaded data.")
         return self.df
 
 
+    def _shrink_dtypes(self):
+        """
+        Downcast integer columns, such as the ID keys, to the narrowest signed dtype that holds their
+        values, to cut the memory moved by the later join. Float columns keep full precision.
+        """
+        for column in self.df.columns:
+            series = self.df[column]
+            if pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                # Narrow types can overflow in arithmetic, so only use the result as keys or cast it back up first
+                self.df[column] = pd.to_numeric(series, downcast='integer')
+
+
     def rename_columns(self):
         """
         Rename specified columns in the DataFrame.
@@ -107,14 +130,9 @@ class FieldDataProcessor:
         - pd.DataFrame: Processed DataFrame with renamed columns.
         """
         # Extract the columns to rename from the configuration
-        column1, column2 = list(self.columns_to_rename.keys())[0], list(self.columns_to_rename.values())[0]       
-        # Temporarily rename one of the columns to avoid a naming conflict
-        temp_name = "__temp_name_for_swap__"
-        while temp_name in self.df.columns:
-            temp_name += "_"
-        # Perform the swap
-        self.df = self.df.rename(columns={column1: temp_name, column2: column1})
-        self.df = self.df.rename(columns={temp_name: column2})
+        column1, column2 = list(self.columns_to_rename.keys())[0], list(self.columns_to_rename.values())[0]
+        # rename maps every label at once, so both columns can be swapped in a single call
+        self.df.rename(columns={column1: column2, column2: column1}, inplace=True)
         self.logger.info(f"Swapped columns: {column1} with {column2}")
         return self.df
         
@@ -130,8 +148,10 @@ class FieldDataProcessor:
         Returns:
         - pd.DataFrame: Processed DataFrame with applied corrections.
         """
+        # Overwrite the two columns in place; assign would copy the whole DataFrame
         self.df[abs_column] = self.df[abs_column].abs()
-        self.df[column_name] = self.df[column_name].apply(lambda crop: self.values_to_rename.get(crop, crop))
+        original = self.df[column_name]
+        self.df[column_name] = original.map(self.values_to_rename).fillna(original)
         return self.df
 
     
@@ -142,7 +162,10 @@ class FieldDataProcessor:
         Returns:
         - pd.DataFrame: DataFrame with weather station mapping data.
         """
-        return read_from_web_CSV(self.weather_map_data)
+        # The first CSV column is a saved row index; read it as the index so it never becomes a data column.
+        # The mapping holds only integer IDs, which the pyarrow parser types the same way as the default one.
+        csv_engine = 'pyarrow' if pyarrow is not None else 'c'
+        return read_from_web_CSV(self.weather_map_data, index_col=0, engine=csv_engine)
     
     
     def process(self):
@@ -152,9 +175,12 @@ class FieldDataProcessor:
         Returns:
         - pd.DataFrame: Processed DataFrame after all data processing steps.
         """
-        self.df = self.ingest_sql_data()
-        self.df = self.rename_columns()
-        self.df = self.apply_corrections()
-        weather_map_df = self.weather_station_mapping() 
-        self.df = self.df.merge(weather_map_df, on='Field_ID', how='left')
-        self.df = self.df.drop(columns="Unnamed: 0")
\ No newline at end of file
+        # The rename and corrections modify self.df in place, so the join is the only step that builds a new DataFrame
+        self.ingest_sql_data()
+        self.rename_columns()
+        self.apply_corrections()
+        weather_map_df = self.weather_station_mapping()
+        # Index the mapping on Field_ID so the join probes a prebuilt index, and fail fast on duplicate keys
+        weather_map_df = weather_map_df.set_index('Field_ID')
+        self.df = self.df.join(weather_map_df, on='Field_ID', how='left', validate='m:1')
+        return self.df
\ No newline at end of file
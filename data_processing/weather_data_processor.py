@@ -1,9 +1,67 @@
 import re
+import warnings
 import numpy as np
 import pandas as pd
 import logging
 from data_processing.data_ingestion import read_from_web_CSV
 
+try:  # Hyperscan is optional; without it messages are matched with re alone
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:  # Polars is optional; its Rust regex engine extracts groups without a Python call per message
+    import polars as pl
+except ImportError:
+    pl = None
+
+
+# Set up the class logger once at import, so each new instance only has to pick its level
+_WEATHER_LOGGER = logging.getLogger(__name__ + ".WeatherDataProcessor")
+_WEATHER_LOGGER.propagate = False  # Prevents log messages from being propagated to the root logger
+if not _WEATHER_LOGGER.handlers:  # Guard against duplicate handlers when the module is reloaded
+    _handler = logging.StreamHandler()  # Create console handler
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    _WEATHER_LOGGER.addHandler(_handler)
+
+
+def _extract_groups(messages, pattern):
+    """
+    Extract the capture groups of a regex pattern from each message, using Polars when installed.
+
+    Parameters:
+    - messages (pd.Series): The messages containing weather measurements.
+    - pattern (str): The regex pattern to extract.
+
+    Returns:
+    - pd.DataFrame: One column per capture group, with NaN or None where the group did not match.
+    """
+    if pl is not None:
+        try:
+            groups = pl.from_pandas(messages, nan_to_null=True).str.extract_groups(pattern)
+            return groups.struct.unnest().to_pandas()
+        except pl.exceptions.ComputeError:
+            pass  # Pattern uses syntax the Rust regex engine does not support, such as lookarounds
+    return messages.str.extract(pattern, expand=True)
+
+
+def _first_non_null_value(groups):
+    """
+    Return the first non-null group of each row as a float array.
+
+    Parameters:
+    - groups (pd.DataFrame): Capture groups from _extract_groups, one column per group.
+
+    Returns:
+    - np.ndarray: The value of each row, or NaN where no group matched.
+    """
+    values = np.full(len(groups), np.nan)
+    for col in range(groups.shape[1]):
+        group = groups.iloc[:, col]
+        fill = np.isnan(values) & group.notna().to_numpy()
+        values[fill] = group[fill].astype(float).to_numpy()
+    return values
+
 
 class WeatherDataProcessor:
     """
@@ -22,9 +80,13 @@ class WeatherDataProcessor:
     Methods:
     - initialize_logging(logging_level): Set up logging for the instance.
     - weather_station_mapping(): Load weather station data from the web.
+    - compile_hyperscan_database(): Compile the regex patterns into a Hyperscan database.
+    - match_patterns(messages): Find which pattern matches each message using Hyperscan.
     - extract_measurement(message): Extract measurements from a given message using regex patterns.
+    - parse_messages(messages): Extract the measurement and value from each message.
     - process_messages(): Process messages in the DataFrame to extract measurements.
-    - calculate_means(): Calculate mean values for each weather station and measurement.
+    - calculate_means(engine=None): Calculate mean values for each weather station and measurement.
+    - stream_means(chunksize=100_000): Calculate the means while reading the data in chunks.
     - process(): Execute all methods in the correct order for data processing.
     """
     def __init__(self, config_params, logging_level="INFO"): # Now we're passing in the confi_params dictionary already
@@ -39,6 +101,9 @@ class WeatherDataProcessor:
         self.patterns = config_params['regex_patterns']
         self.weather_df = None  # Initialize weather_df as None or as an empty DataFrame
         self.initialize_logging(logging_level)
+        self._compiled = [(key, re.compile(pattern)) for key, pattern in self.patterns.items()]
+        # Matching the patterns through Polars is faster than a Hyperscan pass plus value extraction
+        self._hs_database = self.compile_hyperscan_database() if pl is None else None
 
     def initialize_logging(self, logging_level):
         """
@@ -47,9 +112,7 @@ class WeatherDataProcessor:
         Parameters:
         - logging_level (str): Logging level for the class.
         """
-        logger_name = __name__ + ".WeatherDataProcessor"
-        self.logger = logging.getLogger(logger_name)
-        self.logger.propagate = False  # Prevents log messages from being propagated to the root logger
+        self.logger = _WEATHER_LOGGER
 
         # Set logging level
         if logging_level.upper() == "DEBUG":
@@ -64,13 +127,6 @@ class WeatherDataProcessor:
 
         self.logger.setLevel(log_level)
 
-        # Only add handler if not already added to avoid duplicate messages
-        if not self.logger.handlers:
-            ch = logging.StreamHandler()  # Create console handler
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            ch.setFormatter(formatter)
-            self.logger.addHandler(ch)
-
     def weather_station_mapping(self):
         """
         Load weather station data from the web.
@@ -83,24 +139,124 @@ class WeatherDataProcessor:
         # Here, you can apply any initial transformations to self.weather_df if necessary.
 
     
+    def compile_hyperscan_database(self):
+        """
+        Compile the regex patterns into a Hyperscan database, which matches all of them in one pass.
+
+        Returns:
+        - hyperscan.Database or None: The compiled database, or None if Hyperscan is not installed
+          or cannot compile the patterns.
+        """
+        if hyperscan is None:
+            return None
+        database = hyperscan.Database()
+        try:
+            database.compile(
+                expressions=[pattern.encode() for pattern in self.patterns.values()],
+                ids=list(range(len(self.patterns))),
+                elements=len(self.patterns),
+                # UTF8 and UCP give \s, \d and \w the same Unicode meaning they have in Python's re
+                flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP] * len(self.patterns),
+            )
+        except hyperscan.error as e:
+            self.logger.warning(f"Hyperscan could not compile the patterns, matching them with re instead. Error: {e}")
+            return None
+        self.logger.debug("Hyperscan database compiled.")
+        return database
+
+    def match_patterns(self, messages):
+        """
+        Find which pattern matches each message using Hyperscan.
+
+        As in extract_measurement, the first pattern listed in regex_patterns that matches wins.
+
+        Parameters:
+        - messages (pd.Series): The messages containing weather measurements.
+
+        Returns:
+        - np.ndarray: The index of the matching pattern in self.patterns for each message, or -1 if none matched.
+        """
+        pattern_ids = np.full(len(messages), -1, dtype=np.int64)
+        first = [-1]
+
+        def on_match(pattern_id, start, end, flags, context):
+            if first[0] == -1 or pattern_id < first[0]:
+                first[0] = pattern_id
+            return pattern_id == 0  # Nothing can beat the first pattern, so stop scanning
+
+        for i, message in enumerate(messages.to_numpy()):
+            if not isinstance(message, str):
+                continue
+            first[0] = -1
+            try:
+                self._hs_database.scan(message.encode(), match_event_handler=on_match)
+            except hyperscan.ScanTerminated:
+                pass
+            pattern_ids[i] = first[0]
+        return pattern_ids
+
     def extract_measurement(self, message):
         """
         Extract measurements from a given message using regex patterns.
 
+        The first pattern listed in regex_patterns that matches the message wins.
+
         Parameters:
         - message (str): The message containing weather measurements.
 
         Returns:
         - tuple or None: A tuple containing the measurement key and value, or None if no match is found.
         """
-        for key, pattern in self.patterns.items():
-            match = re.search(pattern, message)
+        for key, pattern in self._compiled:
+            match = pattern.search(message)
             if match:
                 self.logger.debug(f"Measurement extracted: {key}")
                 return key, float(next((x for x in match.groups() if x is not None)))
         self.logger.debug("No measurement match found.")
         return None, None
 
+    def parse_messages(self, messages):
+        """
+        Extract the measurement and value from each message.
+
+        As in extract_measurement, the first pattern listed in regex_patterns that matches a message wins.
+
+        Parameters:
+        - messages (pd.Series): The messages containing weather measurements.
+
+        Returns:
+        - tuple: A pd.Categorical of measurement keys and a float np.ndarray of values, with
+          NaN in both where no pattern matched.
+        """
+        n = len(messages)
+        pattern_ids = np.full(n, -1, dtype=np.int64)
+        value_out = np.full(n, np.nan)
+        if pl is not None:
+            # Each pattern only scans the rows that no earlier pattern matched
+            for pattern_id, pattern in enumerate(self.patterns.values()):
+                rows = np.flatnonzero(pattern_ids == -1)
+                values = _first_non_null_value(_extract_groups(messages.iloc[rows], pattern))
+                matched = ~np.isnan(values)
+                pattern_ids[rows[matched]] = pattern_id
+                value_out[rows[matched]] = values[matched]
+        else:
+            # Without Polars a plain loop over precompiled patterns beats pandas' str.extract.
+            # Hyperscan, when available, names the one pattern each message needs to be searched with.
+            first_ids = self.match_patterns(messages) if self._hs_database is not None else None
+            for i, message in enumerate(messages.to_numpy()):
+                if not isinstance(message, str) or (first_ids is not None and first_ids[i] == -1):
+                    continue
+                start = 0 if first_ids is None else first_ids[i]
+                for pattern_id in range(start, len(self._compiled)):
+                    match = self._compiled[pattern_id][1].search(message)
+                    if match:
+                        pattern_ids[i] = pattern_id
+                        value_out[i] = float(next(x for x in match.groups() if x is not None))
+                        break
+        # The pattern ids are used directly as categorical codes, so calculate_means groups on small integers
+        measurement_out = pd.Categorical.from_codes(pattern_ids, categories=list(self.patterns.keys()))
+        return measurement_out, value_out
+
     def process_messages(self):
         """
         Process messages in the DataFrame to extract measurements.
@@ -109,28 +265,76 @@ class WeatherDataProcessor:
         - pd.DataFrame: Processed DataFrame with extracted measurements.
         """
         if self.weather_df is not None:
-            result = self.weather_df['Message'].apply(self.extract_measurement)
-            self.weather_df['Measurement'], self.weather_df['Value'] = zip(*result)
+            measurement, value = self.parse_messages(self.weather_df['Message'])
+            self.weather_df = self.weather_df.assign(Measurement=measurement, Value=value)
             self.logger.info("Messages processed and measurements extracted.")
         else:
             self.logger.warning("weather_df is not initialized, skipping message processing.")
         return self.weather_df
 
-    def calculate_means(self):
+    def calculate_means(self, engine=None):
         """
         Calculate mean values for each weather station and measurement.
 
+        Parameters:
+        - engine (str, optional): Group-by engine passed to pandas, e.g. 'numba' for a parallel
+          Numba kernel. The first Numba call compiles for several seconds, so it only pays off for
+          repeated calls on large data (default is None, pandas' Cython engine).
+
         Returns:
         - pd.DataFrame or None: DataFrame with mean values or None if weather_df is not initialized.
         """
         if self.weather_df is not None:
-            means = self.weather_df.groupby(by=['Weather_station_ID', 'Measurement'])['Value'].mean()
+            values = self.weather_df.groupby(by=['Weather_station_ID', 'Measurement'], observed=True, sort=False)['Value']
+            if engine == 'numba':
+                with warnings.catch_warnings():
+                    # pandas' Numba kernel warns about an internal index cast while compiling
+                    warnings.filterwarnings('ignore', message='unsafe cast')
+                    means = values.mean(engine='numba', engine_kwargs={'parallel': True, 'nogil': True})
+            else:
+                means = values.mean(engine=engine)
             self.logger.info("Mean values calculated.")
-            return means.unstack()
+            # Only the small unstacked result is sorted. Measurements are sorted by name, not by their
+            # categorical order, so the columns stay alphabetical as before
+            return means.unstack().sort_index().sort_index(axis=1, key=lambda c: c.astype(str))
         else:
             self.logger.warning("weather_df is not initialized, cannot calculate means.")
             return None
     
+    def stream_means(self, chunksize=100_000):
+        """
+        Calculate mean values for each weather station and measurement by reading the weather
+        station data in chunks, without keeping the data or the parsed columns in memory.
+
+        Parameters:
+        - chunksize (int, optional): Number of CSV rows to parse at a time (default is 100_000).
+
+        Returns:
+        - pd.DataFrame or None: DataFrame with mean values, in the same layout as calculate_means,
+          or None if the data has no rows.
+        """
+        sums = None
+        counts = None
+        # Each chunk infers its own dtypes, so pin Message to strings in case a chunk has only blank messages
+        with read_from_web_CSV(self.weather_station_data, chunksize=chunksize, dtype={'Message': 'str'}) as reader:
+            for chunk in reader:
+                measurement, value = self.parse_messages(chunk['Message'])
+                parsed = pd.DataFrame({
+                    'Weather_station_ID': chunk['Weather_station_ID'].to_numpy(),
+                    'Measurement': measurement,
+                    'Value': value,
+                })
+                values = parsed.groupby(by=['Weather_station_ID', 'Measurement'], observed=True, sort=False)['Value']
+                chunk_sums, chunk_counts = values.sum(), values.count()
+                sums = chunk_sums if sums is None else sums.add(chunk_sums, fill_value=0)
+                counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+        if sums is None:
+            self.logger.warning("No weather station data was read, cannot calculate means.")
+            return None
+        means = sums / counts
+        self.logger.info("Mean values calculated from streamed data.")
+        return means.unstack().sort_index().sort_index(axis=1, key=lambda c: c.astype(str))
+
     def process(self):
         """
         Execute all methods in the correct order for data processing.